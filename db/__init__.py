@@ -1,4 +1,4 @@
-# Database utilities for the SQL Query Writer Agent competition
-from .bike_store import BikeStoreDb, get_schema_info
-
-__all__ = ['BikeStoreDb', 'get_schema_info']
+# Database utilities for the SQL Query Writer Agent competition
+from .bike_store import BikeStoreDb, get_schema_info, get_connection, close_all
+
+__all__ = ['BikeStoreDb', 'get_schema_info', 'get_connection', 'close_all']
@@ -1,124 +1,207 @@
-"""
-Bike Store Database Loader
-
-Loads the Kaggle bike store dataset into a DuckDB database.
-This provides the relational database for the SQL Query Writer Agent competition.
-
-Dataset source: https://www.kaggle.com/datasets/dillonmyrick/bike-store-sample-database
-"""
-
-import os
-import duckdb
-import kagglehub
-from sqlalchemy import create_engine
-
-
-class BikeStoreDb:
-    """
-    A class to download and load the bike store dataset into DuckDB.
-
-    Attributes:
-        db_path (str): Path to the DuckDB database file.
-        download_path (str): Path where the dataset is downloaded.
-    """
-
-    def __init__(self, db_path='bike_store.db'):
-        """
-        Initialize the BikeStoreDb and create the database.
-
-        Args:
-            db_path (str): Path where the DuckDB database will be created.
-                          Defaults to 'bike_store.db' in the current directory.
-        """
-        self.db_path = db_path
-        self.download_path = self._download_data()
-        self._create_db()
-
-    @staticmethod
-    def _download_data():
-        """
-        Download the latest version of the bike store dataset from Kaggle.
-
-        Returns:
-            str: Path to the downloaded dataset directory.
-        """
-        path = kagglehub.dataset_download("dillonmyrick/bike-store-sample-database")
-        print(f"Downloaded dataset to {path}")
-        return path
-
-    def _create_db(self):
-        """
-        Create DuckDB tables from all CSV files in the downloaded dataset.
-
-        Each CSV file becomes a table with the same name (without .csv extension).
-        """
-        con = duckdb.connect(database=self.db_path, read_only=False)
-        csv_count = 0
-        for fname in os.listdir(self.download_path):
-            fpath = os.path.join(self.download_path, fname)
-            if fname.lower().endswith(".csv"):
-                csv_count += 1
-                # Create a table name from the filename (without extension)
-                table_name = os.path.splitext(fname)[0]
-
-                # Create a DuckDB table by reading the CSV with automatic detection
-                con.execute(
-                    f"""
-                    CREATE TABLE IF NOT EXISTS {table_name} AS
-                    SELECT * FROM read_csv_auto('{fpath}');
-                    """
-                )
-        con.close()
-        print(f"Created {csv_count} tables in {self.db_path}")
-
-    def get_engine(self):
-        """
-        Get a SQLAlchemy engine connected to the DuckDB database.
-
-        Returns:
-            sqlalchemy.engine.Engine: SQLAlchemy engine for database operations.
-        """
-        engine = create_engine(f"duckdb:///{self.db_path}")
-        return engine
-
-
-def get_schema_info(db_path='bike_store.db'):
-    """
-    Retrieve schema information for all tables in the database.
-
-    Args:
-        db_path (str): Path to the DuckDB database file.
-
-    Returns:
-        dict: Dictionary mapping table names to their column information.
-    """
-    con = duckdb.connect(database=db_path, read_only=True)
-
-    # Get all table names
-    tables = con.execute("SHOW TABLES").fetchall()
-
-    schema_info = {}
-    for (table_name,) in tables:
-        # Get column information for each table
-        columns = con.execute(f"DESCRIBE {table_name}").fetchall()
-        schema_info[table_name] = [
-            {"name": col[0], "type": col[1]} for col in columns
-        ]
-
-    con.close()
-    return schema_info
-
-
-if __name__ == "__main__":
-    # Example usage: Initialize the database
-    print("Initializing Bike Store Database...")
-    db = BikeStoreDb()
-
-    # Display schema information
-    print("\nDatabase Schema:")
-    print("-" * 50)
-    schema = get_schema_info()
-    for table, columns in schema.items():
-        print(f"\nTable: {table}")
-        for col in columns:
-            print(f"  - {col['name']}: {col['type']}")
+"""
+Bike Store Database Loader
+
+Loads the Kaggle bike store dataset into a DuckDB database.
+This provides the relational database for the SQL Query Writer Agent competition.
+
+Dataset source: https://www.kaggle.com/datasets/dillonmyrick/bike-store-sample-database
+"""
+
+import functools
+import glob
+import os
+import threading
+import duckdb
+import kagglehub
+from sqlalchemy import create_engine
+
+# Pool of long-lived read-only connections, one per database file. Opening
+# a DuckDB file pays file-open and catalog-load costs, so readers share a
+# connection and take lightweight cursors off it instead.
+_CONNS: dict = {}
+_CONNS_LOCK = threading.Lock()
+
+
+def _quoted_ident(name):
+    """
+    Quote a SQL identifier for safe interpolation into a statement.
+
+    Args:
+        name (str): Raw identifier (e.g. a table name derived from a filename).
+
+    Returns:
+        str: The identifier wrapped in double quotes, with embedded quotes escaped.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def get_connection(db_path='bike_store.db'):
+    """
+    Get a pooled read-only connection to a DuckDB database.
+
+    The underlying connection is opened once per db_path and kept for the
+    lifetime of the process; a cursor is returned per call, which DuckDB
+    makes cheap and safe to use from multiple threads.
+
+    Args:
+        db_path (str): Path to the DuckDB database file.
+
+    Returns:
+        duckdb.DuckDBPyConnection: A cursor on the shared connection.
+    """
+    with _CONNS_LOCK:
+        con = _CONNS.get(db_path)
+        if con is None:
+            con = duckdb.connect(database=db_path, read_only=True)
+            _CONNS[db_path] = con
+    return con.cursor()
+
+
+def close_all():
+    """
+    Close all pooled read-only connections (for teardown).
+    """
+    with _CONNS_LOCK:
+        for con in _CONNS.values():
+            con.close()
+        _CONNS.clear()
+
+
+class BikeStoreDb:
+    """
+    A class to download and load the bike store dataset into DuckDB.
+
+    Attributes:
+        db_path (str): Path to the DuckDB database file.
+        download_path (str): Path where the dataset is downloaded.
+    """
+
+    def __init__(self, db_path='bike_store.db'):
+        """
+        Initialize the BikeStoreDb and create the database.
+
+        Args:
+            db_path (str): Path where the DuckDB database will be created.
+                          Defaults to 'bike_store.db' in the current directory.
+        """
+        self.db_path = db_path
+        self.download_path = self._download_data()
+        self._create_db()
+
+    @staticmethod
+    def _download_data():
+        """
+        Download the latest version of the bike store dataset from Kaggle.
+
+        Returns:
+            str: Path to the downloaded dataset directory.
+        """
+        path = kagglehub.dataset_download("dillonmyrick/bike-store-sample-database")
+        print(f"Downloaded dataset to {path}")
+        return path
+
+    def _create_db(self):
+        """
+        Create DuckDB tables from all CSV files in the downloaded dataset.
+
+        Each CSV file becomes a table with the same name (without .csv extension).
+        """
+        con = duckdb.connect(database=self.db_path, read_only=False)
+        # Let DuckDB parallelize CSV sniffing and parsing across all cores.
+        con.execute("SET threads TO ?", [os.cpu_count()])
+
+        csv_files = glob.glob(os.path.join(self.download_path, "*.csv"))
+
+        # Skip CSVs whose table already exists so reruns don't pay the CSV
+        # sniff at all; one catalog query instead of relying on
+        # CREATE TABLE IF NOT EXISTS per file.
+        existing = {
+            row[0] for row in con.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"
+            ).fetchall()
+        }
+
+        # One transaction for the whole load so catalog writes are batched
+        # instead of fsynced per table.
+        created = 0
+        con.begin()
+        for fpath in csv_files:
+            # Create a table name from the filename (without extension)
+            table_name = os.path.splitext(os.path.basename(fpath))[0]
+            if table_name in existing:
+                continue
+
+            # Create a DuckDB table by reading the CSV with automatic
+            # detection; the path is bound as a parameter and the table
+            # name is quoted so filenames with special characters are safe.
+            con.execute(
+                f"CREATE TABLE {_quoted_ident(table_name)} AS SELECT * FROM read_csv_auto(?)",
+                [fpath],
+            )
+            created += 1
+        con.commit()
+        con.close()
+        print(f"Created {created} tables in {self.db_path} ({len(csv_files) - created} already present)")
+
+    def get_engine(self):
+        """
+        Get a SQLAlchemy engine connected to the DuckDB database.
+
+        Returns:
+            sqlalchemy.engine.Engine: SQLAlchemy engine for database operations.
+        """
+        engine = create_engine(f"duckdb:///{self.db_path}")
+        return engine
+
+
+@functools.lru_cache(maxsize=None)
+def get_schema_info(db_path='bike_store.db'):
+    """
+    Retrieve schema information for all tables in the database.
+
+    The schema never changes during an evaluation run, so results are
+    memoized per db_path: the database is queried once and subsequent
+    calls are a cache lookup.
+
+    Args:
+        db_path (str): Path to the DuckDB database file.
+
+    Returns:
+        dict: Dictionary mapping table names to their column information.
+    """
+    con = get_connection(db_path)
+
+    # One catalog query for every table instead of SHOW TABLES plus a
+    # DESCRIBE round-trip per table.
+    rows = con.execute(
+        """
+        SELECT table_name, column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = 'main'
+        ORDER BY table_name, ordinal_position
+        """
+    ).fetchall()
+
+    schema_info = {}
+    for table_name, column_name, data_type in rows:
+        schema_info.setdefault(table_name, []).append(
+            {"name": column_name, "type": data_type}
+        )
+
+    con.close()
+    return schema_info
+
+
+if __name__ == "__main__":
+    # Example usage: Initialize the database
+    print("Initializing Bike Store Database...")
+    db = BikeStoreDb()
+
+    # Display schema information
+    print("\nDatabase Schema:")
+    print("-" * 50)
+    schema = get_schema_info()
+    for table, columns in schema.items():
+        print(f"\nTable: {table}")
+        for col in columns:
+            print(f"  - {col['name']}: {col['type']}")